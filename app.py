@@ -1,58 +1,217 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import html
 import os
-import smtplib
+import logging
+import time
 import base64
 from datetime import datetime
-from email_validator import validate_email, EmailNotValidError
+from itertools import chain
+from collections import ChainMap
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import cloudinary
 import cloudinary.uploader
 from config import OLLAMA_CONFIG, APP_CONFIG
 import re
-import validators
 from supabase_client import SupabaseClient
+from smtp_client import SMTPClient
+
+log = logging.getLogger(__name__)
 
 # Ensure directories exist
-os.makedirs(APP_CONFIG['data_dir'], exist_ok=True)
+os.makedirs(APP_CONFIG.data_dir, exist_ok=True)
+
+# Loom share/embed links, with or without the www. prefix; "Copy Link" URLs may carry
+# a trailing slash, query string (e.g. ?sid=...) or fragment after the video id
+_LOOM_RE = re.compile(r"^https://(?:www\.)?loom\.com/(?:share|embed)/[A-Za-z0-9]+(?:[/?#]\S*)?$")
+# Syntax-only email check: local part, domain, and an alphabetic TLD
+_EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+\-]{1,64}@[A-Za-z0-9.\-]{1,253}\.[A-Za-z]{2,}$")
+
+# Generated question blocks, e.g. "**Question 1: ...**" (or "**Question 1**: ...",
+# "**Question 1:** ...") followed by hint/time lines
+_QUESTION_RE = re.compile(
+    r"\*\*Question \d+(?::\*\*|\*\*:|:)[ \t]*(?:\*\*)?(?P<question>[^\n]*?)[ \t]*(?:\*\*)?[ \t]*(?:\n|\Z)"
+    r"(?P<body>.*?)(?=\*\*Question \d+(?::\*\*|\*\*:|:)|\Z)",
+    re.DOTALL
+)
+_HINT_RE = re.compile(r"^[ \t]*🎥 \*([^*]+?)\*", re.MULTILINE)
+_TIME_RE = re.compile(r"^[ \t]*📹 \*([^*]+?)\*", re.MULTILINE)
+
+# Tech stack categories as stored in candidate_data, with their display labels
+_TECH_FIELDS = (
+    ('programming_languages', 'Programming Languages'),
+    ('frontend_frameworks', 'Frontend Frameworks'),
+    ('backend_frameworks', 'Backend Frameworks'),
+    ('databases', 'Databases'),
+    ('cloud_platforms', 'Cloud Platforms'),
+    ('devops_tools', 'DevOps & Development Tools'),
+    ('mobile_development', 'Mobile Development'),
+    ('data_science', 'Data Science & Analytics'),
+    ('testing_frameworks', 'Testing Frameworks & Tools'),
+    ('cms_ecommerce', 'CMS & E-commerce Platforms'),
+    ('other_technologies', 'Other Technologies & Specializations'),
+)
+
+# Multiselect options for the tech stack form
+_LANGUAGE_OPTIONS = (
+    "Python", "JavaScript", "TypeScript", "Java", "C++", "C#", "C",
+    "Go", "Rust", "PHP", "Ruby", "Swift", "Kotlin", "Scala",
+    "R", "MATLAB", "Perl", "Haskell", "Lua", "Dart", "Elixir",
+    "Clojure", "F#", "VB.NET", "COBOL", "Fortran", "Assembly", "Other"
+)
+
+_FRONTEND_OPTIONS = (
+    "React", "Angular", "Vue.js", "Svelte", "Next.js", "Nuxt.js",
+    "Gatsby", "Ember.js", "Backbone.js", "jQuery", "Bootstrap",
+    "Tailwind CSS", "Material-UI", "Ant Design", "Chakra UI",
+    "Styled Components", "SASS/SCSS", "Less", "Other"
+)
+
+_BACKEND_OPTIONS = (
+    "Django", "Flask", "FastAPI", "Express.js", "Node.js", "Spring Boot",
+    "Spring MVC", "Laravel", "CodeIgniter", "Ruby on Rails", "ASP.NET",
+    ".NET Core", "Gin", "Echo", "Fiber", "Actix", "Rocket", "Other"
+)
+
+_DATABASE_OPTIONS = (
+    # Relational
+    "MySQL", "PostgreSQL", "SQLite", "Oracle", "SQL Server", "MariaDB",
+    # NoSQL Document
+    "MongoDB", "CouchDB", "Amazon DocumentDB",
+    # Key-Value
+    "Redis", "Amazon DynamoDB", "Riak",
+    # Column-Family
+    "Cassandra", "HBase",
+    # Graph
+    "Neo4j", "Amazon Neptune", "ArangoDB",
+    # Time Series
+    "InfluxDB", "TimescaleDB",
+    # Other
+    "Elasticsearch", "Solr", "Other"
+)
+
+_CLOUD_OPTIONS = (
+    "Amazon Web Services (AWS)", "Microsoft Azure", "Google Cloud Platform (GCP)",
+    "IBM Cloud", "Oracle Cloud", "Alibaba Cloud", "DigitalOcean",
+    "Linode", "Vultr", "Heroku", "Vercel", "Netlify", "Railway",
+    "PlanetScale", "Supabase", "Firebase", "Other"
+)
+
+_DEVOPS_OPTIONS = (
+    # Version Control
+    "Git", "GitHub", "GitLab", "Bitbucket", "SVN",
+    # CI/CD
+    "Jenkins", "GitHub Actions", "GitLab CI", "CircleCI", "Travis CI",
+    "Azure Pipelines", "TeamCity",
+    # Containerization
+    "Docker", "Kubernetes", "Docker Compose", "Podman",
+    # Infrastructure
+    "Terraform", "Ansible", "Chef", "Puppet", "CloudFormation",
+    # Monitoring
+    "Prometheus", "Grafana", "New Relic", "Datadog", "Splunk",
+    "Other"
+)
+
+_MOBILE_OPTIONS = (
+    "React Native", "Flutter", "Xamarin", "Ionic", "Cordova/PhoneGap",
+    "iOS (Swift/Objective-C)", "Android (Java/Kotlin)", "Unity",
+    "Unreal Engine", "Other"
+)
+
+_DATA_SCIENCE_OPTIONS = (
+    "Pandas", "NumPy", "Scikit-learn", "TensorFlow", "PyTorch", "Keras",
+    "Apache Spark", "Hadoop", "Jupyter", "R Studio", "Tableau",
+    "Power BI", "Looker", "Apache Airflow", "Apache Kafka", "Other"
+)
+
+_TESTING_OPTIONS = (
+    "Jest", "Mocha", "Chai", "Cypress", "Selenium", "Playwright",
+    "Puppeteer", "JUnit", "TestNG", "PyTest", "Unittest", "RSpec",
+    "PHPUnit", "Postman", "Insomnia", "Other"
+)
+
+_CMS_OPTIONS = (
+    "WordPress", "Drupal", "Joomla", "Shopify", "WooCommerce",
+    "Magento", "PrestaShop", "Squarespace", "Wix", "Webflow", "Other"
+)
+
+_OTHER_TECH_OPTIONS = (
+    "Machine Learning", "Artificial Intelligence", "Blockchain",
+    "Cryptocurrency", "IoT", "AR/VR", "Game Development",
+    "Cybersecurity", "Network Administration", "System Administration",
+    "Technical Writing", "UI/UX Design", "Product Management", "Other"
+)
+
+def iter_all_tech(candidate):
+    """Iterate every selected technology across all categories, without building a list"""
+    return chain.from_iterable(candidate.get(key, ()) for key, _ in _TECH_FIELDS)
 
 # Ollama client
-def get_ai_response(prompt, system_msg=""):
+# Keep-alive session so question generation doesn't reopen a TCP connection per call;
+# cached per process because Streamlit re-executes this script on every rerun
+@st.cache_resource
+def get_ollama_session():
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return session
+
+def _stream_generate(prompt, system_msg):
+    """Yield response text from Ollama chunk by chunk as it is generated"""
+    payload = {
+        "model": OLLAMA_CONFIG.model,
+        "prompt": prompt,
+        "system": system_msg,
+        "stream": True,
+        "options": {"temperature": 0.7, "max_tokens": 300}
+    }
+    with get_ollama_session().post(
+        f"{OLLAMA_CONFIG.base_url}/api/generate",
+        json=payload,
+        stream=True,
+        timeout=30
+    ) as response:
+        for line in response.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            yield chunk.get("response", "")
+            if chunk.get("done"):
+                break
+
+# Streamed text is redrawn at most this often rather than once per token
+_STREAM_RENDER_INTERVAL = 0.1  # seconds
+
+def get_ai_response(prompt, system_msg="", placeholder=None):
+    # Not memoized with st.cache_data: the caller keeps the finished text in
+    # st.session_state.generated_questions, so reruns never call the model again
     try:
-        payload = {
-            "model": OLLAMA_CONFIG['model'],
-            "prompt": prompt,
-            "system": system_msg,
-            "stream": False,
-            "options": {"temperature": 0.7, "max_tokens": 300}
-        }
-        response = requests.post(
-            f"{OLLAMA_CONFIG['base_url']}/api/generate",
-            json=payload,
-            timeout=30
-        )
-        return response.json().get("response", "Sorry, I couldn't process that.")
+        text = ""
+        last_render = 0.0
+        for token in _stream_generate(prompt, system_msg):
+            text += token
+            # Render tokens as they arrive instead of waiting for the full answer
+            if placeholder is not None and time.monotonic() - last_render >= _STREAM_RENDER_INTERVAL:
+                placeholder.markdown(text)
+                last_render = time.monotonic()
+        if placeholder is not None:
+            placeholder.markdown(text)
+        return text or "Sorry, I couldn't process that."
     except Exception as e:
         return f"Connection error: {str(e)}. Make sure Ollama is running!"
 
 # Data storage functions
 def save_candidate(data):
     try:
-        if os.path.exists(APP_CONFIG['candidates_file']):
-            with open(APP_CONFIG['candidates_file'], 'r') as f:
-                candidates = json.load(f)
-        else:
-            candidates = []
-        
         data['timestamp'] = datetime.now().isoformat()
         data['has_video_responses'] = bool(data.get('video_responses'))
-        candidates.append(data)
         
-        with open(APP_CONFIG['candidates_file'], 'w') as f:
-            json.dump(candidates, f, indent=2)
+        # Append-only JSON Lines: one record per line, no read/rewrite of history
+        with open(APP_CONFIG.candidates_file, 'a') as f:
+            f.write(json.dumps(data, separators=(',', ':')) + '\n')
         return True
     except Exception as e:
         st.error(f"Error saving data: {e}")
@@ -60,53 +219,25 @@ def save_candidate(data):
 
 # Validation functions
 def is_valid_email(email):
-    try:
-        validate_email(email)
-        return True
-    except EmailNotValidError:
-        return False
+    return _EMAIL_RE.match(email.strip()) is not None
 
 # New validation function
 def validate_loom_url(url):
     """Validate if URL is a valid Loom share link"""
-    
-    if not url:
-        return False
-        
-    # Loom URL patterns
-    # Use the validators library first for general URL validation
-    if not validators.url(url):
-        return False
-        
-    # Then check for specific Loom patterns
-    loom_patterns = [
-        r'https://www\.loom\.com/share/[a-zA-Z0-9]+',
-        r'https://loom\.com/share/[a-zA-Z0-9]+',
-        r'https://www\.loom\.com/embed/[a-zA-Z0-9]+',
-        r'https://loom\.com/embed/[a-zA-Z0-9]+', # Added loom.com/embed pattern
-    ]
-    
-    return any(re.match(pattern, url.strip()) for pattern in loom_patterns)
-
-# Email notification function
-def send_email_notification(candidate_email, candidate_name):
-    print(f"Attempting to send email to {candidate_email}")
-    try:
-        print("Connecting to SMTP server...")
-        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
-        print("Starting TLS...")
-        server.starttls() # Secure the connection
-        print("Logging in...")
-        server.login(EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password'])
-        print("Login successful. Creating message...")
-        
-        message = MIMEMultipart()
-        message["From"] = EMAIL_CONFIG['sender_email']
-        message["To"] = candidate_email
-        message["Subject"] = "Application Submitted - TalentScout"
+    return bool(url) and _LOOM_RE.match(url.strip()) is not None
+
+# SMTP connection shared by all sessions in this process
+@st.cache_resource
+def get_smtp():
+    return SMTPClient(
+        EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'],
+        EMAIL_CONFIG['sender_email'], EMAIL_CONFIG['sender_password']
+    )
 
-        body = f"""
-Dear {candidate_name},
+# Confirmation email sent after a completed application
+_EMAIL_SUBJECT = "Application Submitted - TalentScout"
+_EMAIL_BODY_TEMPLATE = """
+Dear {name},
 
 Thank you for completing your application with TalentScout!
 
@@ -123,27 +254,34 @@ Best regards,
 TalentScout Team
 """
 
-        message.attach(MIMEText(body, "plain"))
-
-        text = message.as_string()
-        server.sendmail(EMAIL_CONFIG['sender_email'], candidate_email, text)
-        print("Email sent successfully!")
-        server.quit()
+# Email notification function
+def send_email_notification(candidate_email, candidate_name):
+    log.debug("Attempting to send email to %s", candidate_email)
+    try:
+        log.debug("Creating message...")
+        
+        # Single-part plain text body; no multipart wrapper needed
+        message = MIMEText(_EMAIL_BODY_TEMPLATE.format(name=candidate_name), "plain")
+        message["From"] = EMAIL_CONFIG['sender_email']
+        message["To"] = candidate_email
+        message["Subject"] = _EMAIL_SUBJECT
 
-        print("SMTP connection closed.")
+        get_smtp().sendmail(candidate_email, message.as_string())
+        log.debug("Email sent successfully!")
         return True
     except Exception as e:
-        print(f"Error details: {e}") # Ensure error details are printed
+        log.error("Error details: %s", e)
         st.error(f"Email notification failed: {e}")
         return False
 
-# Initialize Supabase client
-if 'supabase_client' not in st.session_state:
-    st.session_state.supabase_client = SupabaseClient()
+# Supabase client shared by all sessions in this process
+@st.cache_resource
+def get_supabase():
+    return SupabaseClient()
 
 def save_candidate_hybrid(data):
     """Save to both Supabase and JSON"""
-    result = st.session_state.supabase_client.save_candidate(data)
+    result = get_supabase().save_candidate(data, force=True) # Flush now so the candidate sees the real outcome
     
     if result["success"]:
         if "fallback" in result:
@@ -155,6 +293,23 @@ def save_candidate_hybrid(data):
         st.error(f"❌ Error saving data: {result['error']}")
         return False
 
+# Page styles; re-sent each rerun since Streamlit drops elements a run doesn't emit
+_CUSTOM_CSS = """
+<style>
+.main-header {
+    background: linear-gradient(90deg, #2E86AB, #A23B72);
+    padding: 1rem;
+    border-radius: 10px;
+    color: white;
+    text-align: center;
+    margin-bottom: 2rem;
+}
+.stTextInput > div > div > input {
+    border-radius: 5px;
+}
+</style>
+"""
+
 # Main Streamlit App
 def main():
     st.set_page_config(
@@ -164,34 +319,7 @@ def main():
     )
     
     # Custom CSS
-    st.markdown("""
-    <style>
-    .main-header {
-        background: linear-gradient(90deg, #2E86AB, #A23B72);
-        padding: 1rem;
-        border-radius: 10px;
-        color: white;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .question-container {
-        background: #f8f9fa;
-        padding: 20px;
-        border-radius: 10px;
-        margin: 20px 0;
-        border-left: 4px solid #2E86AB;
-    }
-    .recording-status {
-        background: #e3f2fd;
-        padding: 10px;
-        border-radius: 5px;
-        margin: 10px 0;
-    }
-    .stTextInput > div > div > input {
-        border-radius: 5px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
     
     # Header
     st.markdown(
@@ -280,134 +408,67 @@ def collect_tech_stack():
         # Programming Languages (Expanded)
         languages = st.multiselect(
             "Programming Languages",
-            [
-                "Python", "JavaScript", "TypeScript", "Java", "C++", "C#", "C",
-                "Go", "Rust", "PHP", "Ruby", "Swift", "Kotlin", "Scala",
-                "R", "MATLAB", "Perl", "Haskell", "Lua", "Dart", "Elixir",
-                "Clojure", "F#", "VB.NET", "COBOL", "Fortran", "Assembly", "Other"
-            ]
+            _LANGUAGE_OPTIONS
         )
 
         # Frontend Frameworks & Libraries
         frontend = st.multiselect(
             "Frontend Frameworks & Libraries",
-            [
-                "React", "Angular", "Vue.js", "Svelte", "Next.js", "Nuxt.js",
-                "Gatsby", "Ember.js", "Backbone.js", "jQuery", "Bootstrap",
-                "Tailwind CSS", "Material-UI", "Ant Design", "Chakra UI",
-                "Styled Components", "SASS/SCSS", "Less", "Other"
-            ]
+            _FRONTEND_OPTIONS
         )
 
         # Backend Frameworks
         backend = st.multiselect(
             "Backend Frameworks",
-            [
-                "Django", "Flask", "FastAPI", "Express.js", "Node.js", "Spring Boot",
-                "Spring MVC", "Laravel", "CodeIgniter", "Ruby on Rails", "ASP.NET",
-                ".NET Core", "Gin", "Echo", "Fiber", "Actix", "Rocket", "Other"
-            ]
+            _BACKEND_OPTIONS
         )
 
         # Databases (Expanded)
         databases = st.multiselect(
             "Databases",
-            [
-                # Relational
-                "MySQL", "PostgreSQL", "SQLite", "Oracle", "SQL Server", "MariaDB",
-                # NoSQL Document
-                "MongoDB", "CouchDB", "Amazon DocumentDB",
-                # Key-Value
-                "Redis", "Amazon DynamoDB", "Riak",
-                # Column-Family
-                "Cassandra", "HBase",
-                # Graph
-                "Neo4j", "Amazon Neptune", "ArangoDB",
-                # Time Series
-                "InfluxDB", "TimescaleDB",
-                # Other
-                "Elasticsearch", "Solr", "Other"
-            ]
+            _DATABASE_OPTIONS
         )
 
         # Cloud Platforms
         cloud_platforms = st.multiselect(
             "Cloud Platforms",
-            [
-                "Amazon Web Services (AWS)", "Microsoft Azure", "Google Cloud Platform (GCP)",
-                "IBM Cloud", "Oracle Cloud", "Alibaba Cloud", "DigitalOcean",
-                "Linode", "Vultr", "Heroku", "Vercel", "Netlify", "Railway",
-                "PlanetScale", "Supabase", "Firebase", "Other"
-            ]
+            _CLOUD_OPTIONS
         )
 
         # DevOps & Tools
         devops_tools = st.multiselect(
             "DevOps & Development Tools",
-            [
-                # Version Control
-                "Git", "GitHub", "GitLab", "Bitbucket", "SVN",
-                # CI/CD
-                "Jenkins", "GitHub Actions", "GitLab CI", "CircleCI", "Travis CI",
-                "Azure Pipelines", "TeamCity",
-                # Containerization
-                "Docker", "Kubernetes", "Docker Compose", "Podman",
-                # Infrastructure
-                "Terraform", "Ansible", "Chef", "Puppet", "CloudFormation",
-                # Monitoring
-                "Prometheus", "Grafana", "New Relic", "Datadog", "Splunk",
-                "Other"
-            ]
+            _DEVOPS_OPTIONS
         )
 
         # Mobile Development
         mobile = st.multiselect(
             "Mobile Development",
-            [
-                "React Native", "Flutter", "Xamarin", "Ionic", "Cordova/PhoneGap",
-                "iOS (Swift/Objective-C)", "Android (Java/Kotlin)", "Unity",
-                "Unreal Engine", "Other"
-            ]
+            _MOBILE_OPTIONS
         )
 
         # Data Science & Analytics
         data_science = st.multiselect(
             "Data Science & Analytics",
-            [
-                "Pandas", "NumPy", "Scikit-learn", "TensorFlow", "PyTorch", "Keras",
-                "Apache Spark", "Hadoop", "Jupyter", "R Studio", "Tableau",
-                "Power BI", "Looker", "Apache Airflow", "Apache Kafka", "Other"
-            ]
+            _DATA_SCIENCE_OPTIONS
         )
 
         # Testing Frameworks
         testing = st.multiselect(
             "Testing Frameworks & Tools",
-            [
-                "Jest", "Mocha", "Chai", "Cypress", "Selenium", "Playwright",
-                "Puppeteer", "JUnit", "TestNG", "PyTest", "Unittest", "RSpec",
-                "PHPUnit", "Postman", "Insomnia", "Other"
-            ]
+            _TESTING_OPTIONS
         )
 
         # CMS & E-commerce
         cms_ecommerce = st.multiselect(
             "CMS & E-commerce Platforms",
-            [
-                "WordPress", "Drupal", "Joomla", "Shopify", "WooCommerce",
-                "Magento", "PrestaShop", "Squarespace", "Wix", "Webflow", "Other"
-            ]
+            _CMS_OPTIONS
         )
 
         # Other Specializations
         other_tech = st.multiselect(
             "Other Technologies & Specializations",
-            [
-                "Machine Learning", "Artificial Intelligence", "Blockchain",
-                "Cryptocurrency", "IoT", "AR/VR", "Game Development",
-                "Cybersecurity", "Network Administration", "System Administration",
-                "Technical Writing", "UI/UX Design", "Product Management", "Other"
-            ]
+            _OTHER_TECH_OPTIONS
         )
 
         # Additional Skills Text Area
@@ -420,22 +481,12 @@ def collect_tech_stack():
         submitted = st.form_submit_button("Generate Interview Questions", type="primary")
 
         if submitted:
-            # Collect all selected technologies (This might be too much for prompt, will summarize in generate_enhanced_questions)
-            # Storing all selected for potential future use or detailed saving if needed.
-            all_selected_list = []
-            if languages: all_selected_list.extend(languages)
-            if frontend: all_selected_list.extend(frontend)
-            if backend: all_selected_list.extend(backend)
-            if databases: all_selected_list.extend(databases)
-            if cloud_platforms: all_selected_list.extend(cloud_platforms)
-            if devops_tools: all_selected_list.extend(devops_tools)
-            if mobile: all_selected_list.extend(mobile)
-            if data_science: all_selected_list.extend(data_science)
-            if testing: all_selected_list.extend(testing)
-            if cms_ecommerce: all_selected_list.extend(cms_ecommerce)
-            if other_tech: all_selected_list.extend(other_tech)
-
-            if not all_selected_list and not additional_skills.strip():
+            any_selected = any((
+                languages, frontend, backend, databases, cloud_platforms, devops_tools,
+                mobile, data_science, testing, cms_ecommerce, other_tech
+            ))
+
+            if not any_selected and not additional_skills.strip():
                 st.error("Please select at least one technology or add details in Additional Skills")
             else:
                 st.session_state.candidate_data.update({
@@ -450,13 +501,12 @@ def collect_tech_stack():
                     'testing_frameworks': testing,
                     'cms_ecommerce': cms_ecommerce,
                     'other_technologies': other_tech,
-                    'additional_skills': additional_skills.strip(),
-                    'all_selected_tech_list': all_selected_list # Storing all selected in a list as well
+                    'additional_skills': additional_skills.strip()
                 })
                 st.session_state.step = 3
                 st.rerun()
 
-def generate_enhanced_questions():
+def generate_enhanced_questions(placeholder=None):
     candidate = st.session_state.candidate_data
     experience_level = candidate.get('experience', 0) # Get experience safely
     
@@ -472,29 +522,11 @@ def generate_enhanced_questions():
         exp_descriptor = "experienced"
     
     # Create comprehensive tech stack summary
-    tech_summary = []
-    if candidate.get('programming_languages'):
-        tech_summary.append(f"Programming Languages: {', '.join(candidate['programming_languages'])}")
-    if candidate.get('frontend_frameworks'):
-        tech_summary.append(f"Frontend Frameworks: {', '.join(candidate['frontend_frameworks'])}")
-    if candidate.get('backend_frameworks'):
-        tech_summary.append(f"Backend Frameworks: {', '.join(candidate['backend_frameworks'])}")
-    if candidate.get('databases'):
-        tech_summary.append(f"Databases: {', '.join(candidate['databases'])}")
-    if candidate.get('cloud_platforms'):
-        tech_summary.append(f"Cloud Platforms: {', '.join(candidate['cloud_platforms'])}")
-    if candidate.get('devops_tools'):
-        tech_summary.append(f"DevOps & Development Tools: {', '.join(candidate['devops_tools'])}")
-    if candidate.get('mobile_development'):
-        tech_summary.append(f"Mobile Development: {', '.join(candidate['mobile_development'])}")
-    if candidate.get('data_science'):
-        tech_summary.append(f"Data Science & Analytics: {', '.join(candidate['data_science'])}")
-    if candidate.get('testing_frameworks'):
-        tech_summary.append(f"Testing Frameworks & Tools: {', '.join(candidate['testing_frameworks'])}")
-    if candidate.get('cms_ecommerce'):
-        tech_summary.append(f"CMS & E-commerce Platforms: {', '.join(candidate['cms_ecommerce'])}")
-    if candidate.get('other_technologies'):
-        tech_summary.append(f"Other Technologies & Specializations: {', '.join(candidate['other_technologies'])}")
+    tech_summary = [
+        f"{label}: {', '.join(values)}"
+        for key, label in _TECH_FIELDS
+        if (values := candidate.get(key))
+    ]
     
     tech_stack_text = "; ".join(tech_summary) if tech_summary else "no specific technical skills mentioned"
     
@@ -541,7 +573,30 @@ Make questions conversational and realistic - as if you're sitting across from t
 - **Include a variety of question types: theoretical, problem-solving, system design, and coding tasks.**
 """
 
-    return get_ai_response(prompt, system_prompt)
+    return get_ai_response(prompt, system_prompt, placeholder)
+
+def _parse_question_blocks(questions_text):
+    """Split generated text into question, hints, and recommended time per question"""
+    parsed_questions = []
+    for match in _QUESTION_RE.finditer(questions_text):
+        body = match.group("body")
+        time_match = _TIME_RE.search(body)
+        parsed_questions.append({
+            "question": match.group("question").strip(), # Store just the main question text
+            "hints": [hint.strip() for hint in _HINT_RE.findall(body)], # Store parsed hints
+            "recommended_time": time_match.group(1).strip() if time_match else "", # Store parsed recommended time
+            "full_text": match.group(0).strip(), # Keep the full generated block as well for completeness
+        })
+    return parsed_questions
+
+# Session keys the completion page still needs; everything else is dropped after saving
+_SESSION_ALLOWED_KEYS = {'step', 'candidate_data', 'submission', 'email_sent'}
+
+def _prune_session_state():
+    """Free per-step working data (question text, parsed blocks, widget values) once saved"""
+    for key in list(st.session_state.keys()):
+        if key not in _SESSION_ALLOWED_KEYS:
+            del st.session_state[key]
 
 def generate_questions():
     st.markdown("#### Technical Interview Questions 🎯", unsafe_allow_html=True)
@@ -550,8 +605,10 @@ def generate_questions():
     
     # Generate questions if not already generated and stored
     if 'generated_questions' not in st.session_state:
-        with st.spinner("Generating personalized interview questions..."):
-            st.session_state.generated_questions = generate_enhanced_questions()
+        stream_placeholder = st.empty()
+        stream_placeholder.caption("Generating personalized interview questions...")
+        st.session_state.generated_questions = generate_enhanced_questions(stream_placeholder)
+        stream_placeholder.empty() # Parsed questions are rendered below
     
     # Display questions in the original format (single block)
     st.write("### 📹 Video Interview Questions")
@@ -590,113 +647,47 @@ def generate_questions():
     if 'video_responses' not in st.session_state:
         st.session_state.video_responses = {}
 
-    # Parse the generated questions to create input fields
-    questions_text = st.session_state.generated_questions
-    # Simple parsing assuming format like: **Question 1: ...**
-    question_blocks = questions_text.split('**Question ')[1:] # Split into blocks per question
-    num_questions = len(question_blocks)
+    # Parsed once per generation; reruns reuse the cached result
+    if 'parsed_questions' not in st.session_state:
+        st.session_state.parsed_questions = _parse_question_blocks(st.session_state.generated_questions)
+    parsed_questions = st.session_state.parsed_questions
+    num_questions = len(parsed_questions)
 
     # Create form for video responses (using a form for grouped submission)
     with st.form("video_responses_form"):
         # st.write("Paste your Loom video links below, corresponding to each question above:") # Remove this introductory line
+        # Inputs inside a form don't rerun the script on edit; everything below runs only on submit
         
-        for i in range(num_questions):
-            question_num = i + 1
-            # Get the full question block text
-            full_question_block = "**Question " + question_blocks[i].strip()
-            
-            # --- Start: Parse and Display Question and Hints ---
-            lines = full_question_block.split('\n')
-            main_question = ""
-            hints_list = []
-            recommended_time = ""
-
-            # Parse the main question, hints, and recommended time
-            question_found = False
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue # Skip empty lines
-
-                # Find the line that contains the main question title
-                if line.startswith(f'**Question {question_num}:'):
-                     # Extract text after the colon for the main question
-                    parts = line.split(':', 1)
-                    if len(parts) > 1:
-                        main_question = parts[1].strip()
-                        # Remove leading '**' if present
-                        if main_question.startswith('**'):
-                            main_question = main_question[2:].strip()
-                        # Remove trailing '**' if present (AI might include it)
-                        if main_question.endswith('**'):
-                            main_question = main_question[:-2].strip()
-                    question_found = True
-                elif question_found:
-                    # After finding the question, look for hints and recommended time
-                    hint_text_match = re.match(r'🎥 \*([^\*]+?)\*', line)
-                    time_match = re.match(r'📹 \*([^\*]+?)\*', line)
-
-                    if hint_text_match:
-                        hints_list.append(hint_text_match.group(1).strip())
-                    elif time_match:
-                         recommended_time = time_match.group(1).strip()
-
-            # Display the question title clearly, separating number and actual question
-            st.markdown(f"<h4>Question {question_num}:</h4>", unsafe_allow_html=True)
-            # Display the main question with a larger font size
-            st.markdown(f"<div style='font-size: 1.5rem; font-weight: bold;'>{main_question}</div>", unsafe_allow_html=True)
-
-            # Display hints in a list with smaller font
+        for question_num, parsed in enumerate(parsed_questions, start=1):
+            main_question = parsed["question"]
+            hints_list = parsed["hints"]
+            recommended_time = parsed["recommended_time"]
+
+            # --- Start: Display Question and Hints ---
+            # Title, question, hints and time go out as one element instead of one per line
+            question_html = (
+                f"<h4>Question {question_num}:</h4>"
+                f"<div style='font-size: 1.5rem; font-weight: bold;'>{html.escape(main_question)}</div>"
+            )
             if hints_list or recommended_time:
-                # Add some padding below the question for better spacing
-                st.markdown("<div style='margin-top: 10px; font-size: small;'>", unsafe_allow_html=True)
+                question_html += "<div style='margin-top: 10px; font-size: small;'>"
                 if hints_list:
-                    st.markdown("**Hints:**")
-                    for hint in hints_list:
-                        st.markdown(f"- {hint}")
+                    question_html += "<b>Hints:</b><ul>" + "".join(f"<li>{html.escape(hint)}</li>" for hint in hints_list) + "</ul>"
                 if recommended_time:
-                    st.markdown(f"**Recommended Time:** {recommended_time}")
-                st.markdown("</div>", unsafe_allow_html=True)
-            # --- End: Parse and Display Question and Hints ---
-
-            # Retrieve existing value for pre-filling
-            current_loom_link = st.session_state.video_responses.get(f"question_{question_num}", {}).get('loom_url', '')
+                    question_html += f"<b>Recommended Time:</b> {html.escape(recommended_time)}"
+                question_html += "</div>"
+            st.markdown(question_html, unsafe_allow_html=True)
+            # --- End: Display Question and Hints ---
 
             # Loom link input right after the question/hints (Q&A style)
             # Added a small top margin for spacing
-            loom_link = st.text_input(
+            st.text_input(
                 "Paste your Loom video link here:", # Simplified label
                 key=f"loom_q{question_num}", # Unique key for each input
-                value=current_loom_link, # Pre-fill with existing value
                 placeholder="https://www.loom.com/share/your-video-id",
                 # help=f"Record your answer for Question {question_num} and paste the share link here" # Removed redundant help
                 label_visibility="collapsed" # Hide the default label, using markdown above
             )
-            
-            # Add back the validation message display logic which might have been removed
-            if loom_link:
-                if validate_loom_url(loom_link):
-                    st.success(f"✅ Valid Loom link for Question {question_num}")
-                    # Store valid link with question text and timestamp - ensure we store the parsed question and hints here
-                    # Storing the full block is okay, but let's ensure the parsed details are available if needed later
-                    st.session_state.video_responses[f"question_{question_num}"] = {
-                        "question": main_question, # Store just the main question text
-                        "hints": hints_list, # Store parsed hints
-                        "recommended_time": recommended_time, # Store parsed recommended time
-                        "full_text": full_question_block, # Keep the full generated block as well for completeness
-                        "loom_url": loom_link,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                else:
-                     # Remove if invalid (in case user corrects it later)
-                    if f"question_{question_num}" in st.session_state.video_responses:
-                        del st.session_state.video_responses[f"question_{question_num}"]
-                    st.error(f"❌ Invalid Loom URL format for Question {question_num}. Please enter a valid Loom share or embed link.")
-            # If link is empty, ensure it's not stored and remove any previous validation message
-            elif f"question_{question_num}" in st.session_state.video_responses:
-                del st.session_state.video_responses[f"question_{question_num}"]
-                # Also clear the validation message if it was previously shown
-                # This is a bit tricky with Streamlit's reruns, but clearing the state entry helps.
 
             # Add a separator after each question block for clarity
             st.markdown("--- ")
@@ -706,26 +697,60 @@ def generate_questions():
         
         # Handle form submission validation and saving
         if submitted:
+            # Validate all Loom links in a single pass
+            video_responses = {}
+            # Last (url, is_valid) per question, so resubmits skip links that haven't changed
+            loom_validated = st.session_state.setdefault('loom_validated', {})
+            for question_num, details in enumerate(parsed_questions, start=1):
+                # Widget keys keep their value across reruns, so read links from session state
+                loom_link = st.session_state.get(f"loom_q{question_num}", "").strip()
+                if not loom_link:
+                    continue
+                cached = loom_validated.get(question_num)
+                if cached and cached[0] == loom_link:
+                    is_valid = cached[1]
+                else:
+                    is_valid = validate_loom_url(loom_link)
+                    loom_validated[question_num] = (loom_link, is_valid)
+                if is_valid:
+                    st.success(f"✅ Valid Loom link for Question {question_num}")
+                    submitted_at = datetime.now()
+                    video_responses[f"question_{question_num}"] = {
+                        **details,
+                        "loom_url": loom_link,
+                        "timestamp": submitted_at.isoformat(),
+                        "ts_display": submitted_at.strftime('%Y-%m-%d %H:%M')
+                    }
+                else:
+                    st.error(f"❌ Invalid Loom URL format for Question {question_num}. Please enter a valid Loom share or embed link.")
+            st.session_state.video_responses = video_responses
+
+            # Nothing parsed means there is nothing to answer; never save an empty submission
+            if not parsed_questions:
+                st.error("No interview questions could be read from the generated text. Please use Start Over to generate new questions.")
             # Check if the number of VALIDATED video responses matches the number of questions
-            if len(st.session_state.video_responses) < num_questions:
+            elif len(st.session_state.video_responses) < num_questions:
                 st.error("Please provide valid Loom video links for all questions before submitting.")
             else:
-                # Prepare data for saving (now directly update session state first)
-                st.session_state.candidate_data.update({
-                    'video_responses': st.session_state.video_responses, # Add video responses to session state
-                    'generated_questions_full_text': st.session_state.generated_questions # Add full question text to session state for display
-                })
-
-                # Remove the temporary 'generated_questions' if not needed in saved data (it's now in full_text)
-                if 'generated_questions' in st.session_state.candidate_data:
-                    del st.session_state.candidate_data['generated_questions']
+                # Derived fields sit in front of the collected candidate data;
+                # the base dict in session state is never mutated
+                submission = ChainMap({
+                    'video_responses': st.session_state.video_responses,
+                    'generated_questions_full_text': st.session_state.generated_questions, # Full question text for display
+                }, st.session_state.candidate_data)
 
                 # Call the new hybrid save function
-                if save_candidate_hybrid(st.session_state.candidate_data): # Save the updated session state data
+                if save_candidate_hybrid(dict(submission)): # Flatten only at the storage boundary
                     # st.success("Application data saved!") # Message handled in save_candidate_hybrid
                     
-                    # Move to the completion step
+                    # Move to the completion step, keeping only what it reads so
+                    # pruning actually frees the question text
+                    st.session_state.submission = {
+                        'name': submission.get('name'),
+                        'video_responses': submission['video_responses'],
+                    }
                     st.session_state.step = 4 
+                    _prune_session_state()
                     st.rerun()
 
     # [Keep existing "Start Over" button]
@@ -745,36 +770,38 @@ def show_completion():
     st.write(f"- Technical skills assessment")
     
     # Display video responses if available (Revert to displaying list)
-    # Read from st.session_state.candidate_data which was updated before saving and rerunning
-    if 'video_responses' in st.session_state.candidate_data and st.session_state.candidate_data['video_responses']:
+    # Read the submission summary saved before rerunning
+    submission = st.session_state.get('submission') or st.session_state.candidate_data
+    if submission.get('video_responses'):
         st.write("**Your Video Responses:**")
-        # Sort keys to display in order (question_1, question_2, etc.)
-        sorted_video_keys = sorted(st.session_state.candidate_data['video_responses'].keys(), key=lambda x: int(x.split('_')[1]))
-        for key in sorted_video_keys:
-            response = st.session_state.candidate_data['video_responses'][key]
-            with st.expander(f"Question {key.split('_')[1]}"):
-                # Display the full generated question block if stored
-                if 'generated_questions_full_text' in st.session_state.candidate_data:
-                    # Find the relevant question block in the full text
-                    question_block_match = re.search(r'(\*\*Question ' + key.split('_')[1] + r':.*?)(\*\*Question |\Z)', st.session_state.candidate_data['generated_questions_full_text'], re.DOTALL)
-                    if question_block_match:
-                        st.write(question_block_match.group(1).strip())
-                    else:
-                        # Fallback to just displaying the stored question text
-                        st.write(f"**Q:** {response.get('question', f'Question {key.split('_')[1]}')}")
+        # Keys are question_1..question_N, so walk the numbers in order instead of sorting
+        video_responses = submission['video_responses']
+        for question_num in range(1, len(video_responses) + 1):
+            response = video_responses.get(f"question_{question_num}")
+            if response is None:
+                continue
+            qnum = str(question_num)
+            question_text = response.get('question', f"Question {qnum}")
+            with st.expander(f"Question {qnum}"):
+                # Display the full generated question block stored with the response
+                question_block = response.get('full_text')
+                if question_block:
+                    st.write(question_block)
                 else:
-                    # Fallback if full text wasn't saved (from older data)
-                    st.write(f"**Q:** {response.get('question', f'Question {key.split('_')[1]}')}")
+                    # Fallback to just displaying the stored question text
+                    st.write(f"**Q:** {question_text}")
 
                 st.write(f"**Video:** [View Recording]({response['loom_url']})")
-                st.write(f"**Submitted:** {datetime.fromisoformat(response['timestamp']).strftime('%Y-%m-%d %H:%M')}") # Format timestamp
+                # Display string is precomputed at submit; parse only for older data
+                submitted_at = response.get('ts_display') or datetime.fromisoformat(response['timestamp']).strftime('%Y-%m-%d %H:%M')
+                st.write(f"**Submitted:** {submitted_at}") # Format timestamp
     else:
         st.write("- No video responses provided.") # Should not happen if submission logic is correct
 
     st.write(f"- All data saved securely")
 
     # Ensure candidate_data is available (should be if reaching this step after saving)
-    candidate_name = st.session_state.candidate_data.get('name', 'Candidate')
+    candidate_name = submission.get('name') or 'Candidate'
     st.write(f"Thank you **{candidate_name}** for completing the technical assessment.")
     
     st.write("**Next Steps:**")
@@ -1,4 +1,5 @@
 import os
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 
 # Load environment variables from .env file if it exists
@@ -12,17 +13,31 @@ load_dotenv()
 # }
 
 # Ollama Configuration
-OLLAMA_CONFIG = {
-    'base_url': 'http://localhost:11434',
-    'model': 'llama3.2:3b'
-}
+@dataclass(frozen=True)
+class OllamaConfig:
+    base_url: str = 'http://localhost:11434'
+    model: str = 'llama3.2:3b'
 
 # Application Configuration
-APP_CONFIG = {
-    'data_dir': 'data',
-    'temp_video_dir': 'data/temp_videos',
-    'candidates_file': 'data/candidates.json',
-    'max_video_duration': 300,  # 5 minutes in seconds
-    'allowed_video_formats': ['webm', 'mp4'],
-    'max_video_size': 100 * 1024 * 1024  # 100MB in bytes
-} 
\ No newline at end of file
+@dataclass(frozen=True)
+class AppConfig:
+    data_dir: str = 'data'
+    temp_video_dir: str = 'data/temp_videos'
+    max_video_duration: int = 300  # 5 minutes in seconds
+    allowed_video_formats: tuple = ('webm', 'mp4')
+    max_video_size: int = 100 * 1024 * 1024  # 100MB in bytes
+    candidates_file: str = field(init=False)
+
+    def __post_init__(self):
+        # Derived once here rather than joined on every save
+        object.__setattr__(self, 'candidates_file', os.path.join(self.data_dir, 'candidates.jsonl'))
+
+# Supabase Configuration (snapshot of the environment, read once at import)
+@dataclass(frozen=True)
+class SupabaseConfig:
+    url: str = os.getenv('SUPABASE_URL')
+    key: str = os.getenv('SUPABASE_KEY')
+
+OLLAMA_CONFIG = OllamaConfig()
+APP_CONFIG = AppConfig()
+SUPABASE_CONFIG = SupabaseConfig()
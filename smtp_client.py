@@ -0,0 +1,53 @@
+import logging
+import atexit
+import threading
+import smtplib
+
+log = logging.getLogger(__name__)
+
+class SMTPClient:
+    """One SMTP connection reused across notification emails
+
+    TLS handshake and login are paid once per process, not per email.
+    """
+
+    def __init__(self, server, port, sender_email, sender_password):
+        self.server = server
+        self.port = port
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self._smtp = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _connect(self):
+        log.debug("Connecting to SMTP server...")
+        server = smtplib.SMTP(self.server, self.port)
+        log.debug("Starting TLS...")
+        server.starttls() # Secure the connection
+        log.debug("Logging in...")
+        server.login(self.sender_email, self.sender_password)
+        log.debug("Login successful.")
+        return server
+
+    def sendmail(self, to_email, text):
+        """Send a message over the cached connection, reconnecting once if it was dropped"""
+        with self._lock:
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.sendmail(self.sender_email, to_email, text)
+            except smtplib.SMTPServerDisconnected:
+                # Server dropped the idle connection; reconnect once and retry
+                self._smtp = self._connect()
+                self._smtp.sendmail(self.sender_email, to_email, text)
+
+    def close(self):
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except smtplib.SMTPException:
+                    pass
+                self._smtp = None
+                log.debug("SMTP connection closed.")
@@ -1,70 +1,223 @@
 import os
+import logging
+import shutil
+import atexit
+import threading
+import time
+import httpx
 from supabase import create_client, Client
-from dotenv import load_dotenv
+from supabase.lib.client_options import ClientOptions
+from postgrest.types import ReturnMethod
 import json
 from datetime import datetime
+from itertools import islice
+from config import APP_CONFIG, SUPABASE_CONFIG
 
-load_dotenv()
+try:
+    import orjson
+except ImportError:  # stdlib json writes the same lines, just slower
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+LEGACY_CANDIDATES_FILE = os.path.join(APP_CONFIG.data_dir, 'candidates.json')
+
+def _dumps_line(record):
+    """Serialize one record as a compact JSON line, as bytes"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, separators=(',', ':'), default=datetime.isoformat) + '\n').encode()
+
+def migrate_legacy_json():
+    """Move records from the old candidates.json array into the JSON Lines file
+
+    The merged file is built next to the target and swapped in with os.replace,
+    so an interrupted run never leaves records half-appended or duplicated.
+    """
+    target = APP_CONFIG.candidates_file
+    staged = target + ".migrating"
+    try:
+        if os.path.exists(LEGACY_CANDIDATES_FILE):
+            with open(LEGACY_CANDIDATES_FILE, 'r') as f:
+                candidates = json.load(f)
+            with open(staged, 'wb') as out:
+                if os.path.exists(target):
+                    with open(target, 'rb') as existing:
+                        shutil.copyfileobj(existing, out)
+                for candidate in candidates:
+                    out.write(_dumps_line(candidate))
+                out.flush()
+                os.fsync(out.fileno())
+            # Keep the original around rather than deleting candidate data
+            os.replace(LEGACY_CANDIDATES_FILE, LEGACY_CANDIDATES_FILE + ".migrated")
+        if os.path.exists(staged):
+            # Legacy file is retired; finish the swap (also resumes an interrupted run)
+            os.replace(staged, target)
+    except Exception:
+        log.exception("Could not migrate %s; leaving it in place", LEGACY_CANDIDATES_FILE)
 
 class SupabaseClient:
+    # Buffered rows go out in one insert once FLUSH_SIZE is reached, or after
+    # FLUSH_INTERVAL via a timer so a quiet process doesn't hold rows until exit
+    FLUSH_SIZE = 50
+    FLUSH_INTERVAL = 2.0  # seconds
+    # After a network failure or timeout, skip Supabase for this long instead of waiting on it again
+    CIRCUIT_COOLDOWN = 60.0  # seconds
+    REQUEST_TIMEOUT = 3  # seconds
+
     def __init__(self):
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_KEY")
-        self.supabase: Client = create_client(url, key)
+        url = SUPABASE_CONFIG.url
+        key = SUPABASE_CONFIG.key
+        if url and key:
+            # Built once per process (see get_supabase in app.py), so the
+            # postgrest HTTP connection pool is reused across reruns
+            self.supabase: Client = create_client(
+                url, key, options=ClientOptions(postgrest_client_timeout=self.REQUEST_TIMEOUT)
+            )
+        else:
+            log.warning("SUPABASE_URL/SUPABASE_KEY not set; saving candidates to local JSON only")
+            self.supabase = None
+        self._buf = []
+        self._buf_lock = threading.Lock()
+        self._flush_timer = None
+        self._sb_fail_until = 0.0
+        # Fallback file stays open with a large buffer; flushed once per batch
+        self._jsonl = None
+        self._jsonl_lock = threading.Lock()
+        atexit.register(self.close)
+        migrate_legacy_json()
+    
+    def save_candidate(self, candidate_data, force=False):
+        """Queue candidate for a batched Supabase insert with fallback to JSON
+
+        force=True flushes right away so the caller gets a confirmed result.
+        """
+        # Format data for Supabase
+        supabase_data = {
+            "name": candidate_data.get("name"),
+            "email": candidate_data.get("email"),
+            "phone": candidate_data.get("phone"),
+            "experience": candidate_data.get("experience"),
+            "position": candidate_data.get("position"),
+            "location": candidate_data.get("location"),
+            "programming_languages": candidate_data.get("programming_languages", []),
+            "frameworks": candidate_data.get("frameworks", []),
+            "databases": candidate_data.get("databases", []),
+            "tools": candidate_data.get("tools", []),
+            "cloud_platforms": candidate_data.get("cloud_platforms", []),
+            "other_skills": candidate_data.get("other_skills"),
+            "generated_questions": candidate_data.get("generated_questions"),
+            "loom_video_url": candidate_data.get("loom_video_url"),
+            "status": "submitted"
+        }
+
+        with self._buf_lock:
+            self._buf.append((candidate_data, supabase_data))
+            if not force and len(self._buf) < self.FLUSH_SIZE:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return {"success": True, "buffered": True}
+            batch = self._take_buffer_locked()
+        # Network I/O happens outside the lock so other sessions can keep buffering
+        return self._send(batch)
+    
+    def flush(self):
+        """Send any buffered candidates to Supabase now"""
+        with self._buf_lock:
+            batch = self._take_buffer_locked()
+        if not batch:
+            return {"success": True}
+        return self._send(batch)
+    
+    def close(self):
+        """Flush buffered candidates and close the fallback file"""
+        self.flush()
+        with self._jsonl_lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+    
+    def _take_buffer_locked(self):
+        # Caller holds self._buf_lock
+        batch, self._buf = self._buf, []
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        return batch
     
-    def save_candidate(self, candidate_data):
-        """Save candidate to Supabase with fallback to JSON"""
+    def _send(self, batch):
+        # The most recent candidate is last in the batch
         try:
-            # Format data for Supabase
-            supabase_data = {
-                "name": candidate_data.get("name"),
-                "email": candidate_data.get("email"),
-                "phone": candidate_data.get("phone"),
-                "experience": candidate_data.get("experience"),
-                "position": candidate_data.get("position"),
-                "location": candidate_data.get("location"),
-                "programming_languages": candidate_data.get("programming_languages", []),
-                "frameworks": candidate_data.get("frameworks", []),
-                "databases": candidate_data.get("databases", []),
-                "tools": candidate_data.get("tools", []),
-                "cloud_platforms": candidate_data.get("cloud_platforms", []),
-                "other_skills": candidate_data.get("other_skills"),
-                "generated_questions": candidate_data.get("generated_questions"),
-                "loom_video_url": candidate_data.get("loom_video_url"),
-                "status": "submitted"
-            }
-            
-            result = self.supabase.table("candidates").insert(supabase_data).execute()
-            return {"success": True, "data": result.data[0]}
+            if self.supabase is None:
+                raise RuntimeError("Supabase is not configured")
+            if time.monotonic() < self._sb_fail_until:
+                raise RuntimeError("Supabase unavailable; retrying after cooldown")
+            rows = [row for _, row in batch]
+            # Drop columns that are empty in every row; all rows keep the same keys
+            # so PostgREST's bulk insert doesn't misalign them
+            filled = {k for row in rows for k, v in row.items() if v not in (None, '', [], {})}
+            rows = [{k: v for k, v in row.items() if k in filled} for row in rows]
+            try:
+                # Minimal return: PostgREST doesn't echo the inserted rows back
+                self.supabase.table("candidates").insert(rows, returning=ReturnMethod.minimal).execute()
+            except httpx.TransportError:
+                # Only an unreachable or timed-out Supabase opens the circuit; an APIError
+                # is about this batch's rows and falls back for this batch alone
+                self._sb_fail_until = time.monotonic() + self.CIRCUIT_COOLDOWN
+                raise
+            self._sb_fail_until = 0.0
+            return {"success": True, "data": batch[-1][1]}
             
         except Exception as e:
-            # Fallback to JSON storage
-            return self.save_to_json(candidate_data, str(e))
+            # Fallback to JSON storage for the whole batch
+            results = [self.save_to_json(candidate_data, str(e)) for candidate_data, _ in batch]
+            try:
+                self._flush_jsonl()
+            except OSError as json_error:
+                return {"success": False, "error": str(json_error)}
+            return results[-1]
     
     def save_to_json(self, candidate_data, error_msg):
-        """Fallback JSON storage"""
+        """Fallback JSON storage (append-only JSON Lines)"""
         try:
-            if os.path.exists("data/candidates.json"):
-                with open("data/candidates.json", 'r') as f:
-                    candidates = json.load(f)
-            else:
-                candidates = []
-            
-            candidate_data['timestamp'] = datetime.now().isoformat()
-            candidate_data['supabase_error'] = error_msg
-            candidates.append(candidate_data)
+            # The datetime is serialized directly (ISO 8601) by _dumps_line
+            record = dict(candidate_data, timestamp=datetime.now(), supabase_error=error_msg)
             
-            with open("data/candidates.json", 'w') as f:
-                json.dump(candidates, f, indent=2)
+            with self._jsonl_lock:
+                if self._jsonl is None:
+                    self._jsonl = open(APP_CONFIG.candidates_file, 'ab', buffering=1 << 20)
+                self._jsonl.write(_dumps_line(record))
             
             return {"success": True, "fallback": "json", "error": error_msg}
         except Exception as json_error:
             return {"success": False, "error": str(json_error)}
     
-    def get_candidates(self):
-        """Fetch candidates from Supabase"""
+    def _flush_jsonl(self):
+        with self._jsonl_lock:
+            if self._jsonl is not None:
+                self._jsonl.flush()
+    
+    def get_candidates(self, limit=None):
+        """Fetch candidates from Supabase, falling back to the local JSON Lines file"""
         try:
-            result = self.supabase.table("candidates").select("*").execute()
+            if self.supabase is None:
+                raise RuntimeError("Supabase is not configured")
+            query = self.supabase.table("candidates").select("*")
+            if limit is not None:
+                query = query.limit(limit)
+            result = query.execute()
             return result.data
         except Exception as e:
-            return [] 
\ No newline at end of file
+            self._flush_jsonl() # Make buffered fallback rows visible to the reader
+            return list(islice(self._iter_local(), limit))
+    
+    def _iter_local(self):
+        """Yield locally saved candidates one line at a time"""
+        if not os.path.exists(APP_CONFIG.candidates_file):
+            return
+        with open(APP_CONFIG.candidates_file, 'r', buffering=1 << 20) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
\ No newline at end of file